@@ -1,10 +1,13 @@
+from copy import deepcopy
+
 from flask import Flask
 from flask_smorest import Api
 
-from auth import print_jwt_cmd
+from auth import configure_auth, print_jwt_cmd
 from converters import IdConverter, id_converter_params
 from db import db, migrate, recreate_db_command
 from firewalls import models  # noqa: F401 to register models with SQLAlchemy
+from firewalls.flask.pagination import configure_pagination
 from firewalls.flask.views import firewalls
 from health import health
 from settings import Settings
@@ -17,31 +20,49 @@ api = Api()
 settings = Settings()  # type: ignore[call-arg]
 
 
+API_SPEC_OPTIONS = {
+    "security": [{"bearerAuth": []}],
+    "components": {
+        "securitySchemes": {
+            "bearerAuth": {
+                "type": "http",
+                "scheme": "bearer",
+                "bearerFormat": "TEXT",
+            }
+        }
+    },
+}
+
+BASE_CONFIG = {
+    "OPENAPI_VERSION": "3.0.3",
+    "OPENAPI_URL_PREFIX": "/docs",
+    "OPENAPI_SWAGGER_UI_PATH": "/swagger-ui",
+    "OPENAPI_SWAGGER_UI_URL": (
+        "https://cdn.jsdelivr.net/npm/swagger-ui-dist@3.25.x/"
+    ),
+}
+
+
 def initialise_app(flask: Flask, settings_: Settings) -> None:
+    flask.config.update(BASE_CONFIG)
+
     flask.config["SETTINGS"] = settings_
     flask.config["SQLALCHEMY_DATABASE_URI"] = settings_.db_url
     flask.config["TESTING"] = settings_.test
 
-    flask.config["API_TITLE"] = settings.app_name
-    flask.config["API_VERSION"] = settings.version
-    flask.config["OPENAPI_VERSION"] = "3.0.3"
-    flask.config["OPENAPI_URL_PREFIX"] = "/docs"
-    flask.config["OPENAPI_SWAGGER_UI_PATH"] = "/swagger-ui"
-    flask.config["OPENAPI_SWAGGER_UI_URL"] = (
-        "https://cdn.jsdelivr.net/npm/swagger-ui-dist@3.25.x/"
-    )
-    flask.config["API_SPEC_OPTIONS"] = {
-        "security": [{"bearerAuth": []}],
-        "components": {
-            "securitySchemes": {
-                "bearerAuth": {
-                    "type": "http",
-                    "scheme": "bearer",
-                    "bearerFormat": "TEXT",
-                }
-            }
-        },
-    }
+    # Response schemas already fix the order of their keys, so there is no
+    # need to pay for sorting them again when encoding
+    flask.json.sort_keys = False  # type: ignore[attr-defined]
+
+    configure_auth(settings_)
+    configure_pagination(settings_)
+
+    flask.config["API_TITLE"] = settings_.app_name
+    flask.config["API_VERSION"] = settings_.version
+
+    # apispec merges the generated spec into these options in place, so each
+    # app needs its own copy
+    flask.config["API_SPEC_OPTIONS"] = deepcopy(API_SPEC_OPTIONS)
 
     db.init_app(flask)
     migrate.init_app(flask, db)
@@ -1,12 +1,23 @@
 from __future__ import annotations
 
+import binascii
+import hashlib
+import hmac
+import json
+import sys
+import time
+from base64 import urlsafe_b64encode
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 from enum import StrEnum
-from typing import Callable, TypeVar
+from functools import lru_cache, wraps
+from itertools import count
+from threading import Lock
+from typing import Any, Callable, Generic, TypeVar
 
 import click
-import jwt
 from flask import current_app, g, request
 from flask_httpauth import HTTPTokenAuth
 from typing_extensions import ParamSpec
@@ -16,35 +27,118 @@ from settings import Settings
 
 auth = HTTPTokenAuth()
 
+_settings: Settings | None = None
 
-@auth.error_handler
-def auth_error(status):
-    abort(status)
+_executor: ThreadPoolExecutor | None = None
+
+JWT_VERIFICATION_TIMEOUT = 1.0
+
+
+def _threads_are_patched() -> bool:
+    monkey = sys.modules.get("gevent.monkey")
+
+    return monkey is not None and monkey.is_module_patched("threading")
+
+
+def configure_auth(settings_: Settings) -> None:
+    """
+    Bind the settings used to verify tokens.
+
+    This is called by `initialise_app` so that `verify_token` need not look the
+    settings up via `current_app` on every request.
+
+    If `settings_.jwt_verification_workers` is set, tokens are verified on a
+    dedicated thread pool of that size, except under gevent where a pool of
+    real threads would not help and verification stays inline.
+    """
+    global _settings, _executor
+
+    _settings = settings_
+
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+    if settings_.jwt_verification_workers and not _threads_are_patched():
+        _executor = ThreadPoolExecutor(
+            max_workers=settings_.jwt_verification_workers,
+            thread_name_prefix="jwt-verification",
+        )
 
 
 @auth.verify_token
 def verify_token(token: str) -> User | None:
     """
     Verity that the JWT provided is valid and return the associated user.
+
+    When `settings.jwt_cache_enabled` is set, tokens that fail verification are
+    also remembered for a couple of seconds so that clients repeatedly sending
+    the same bad token are rejected without paying for verification each time.
     """
-    settings_ = current_app.config["SETTINGS"]
+    settings_ = _settings
+
+    if settings_ is None:
+        raise RuntimeError("Authentication has not been configured")
+
+    key = None
+
+    if settings_.jwt_cache_enabled:
+        key = _jwt_cache_key(settings_, token)
+
+        reason = _invalid_jwt_cache.get(key)
+
+        if reason is not None:
+            current_app.logger.debug(
+                f"Rejected previously invalid token: {reason}",
+                extra={"invalid_jwt_cache_hits": next(_invalid_jwt_cache_hits)},
+            )
+
+            return None
 
     try:
-        return decode_jwt(settings_, token)
-    except AuthenticationError:
+        return _verify_jwt(settings_, token, key)
+    except AuthenticationError as exc:
+        if key is not None:
+            _invalid_jwt_cache.set(key, str(exc))
+
+        return None
+    except TimeoutError:
+        current_app.logger.warning("Timed out verifying token")
+
+        return None
+
+
+def _verify_jwt(settings_: Settings, token: str, key: bytes | None) -> User:
+    if _executor is None:
+        return decode_jwt(settings_, token, key)
+
+    return _executor.submit(decode_jwt, settings_, token, key).result(
+        timeout=JWT_VERIFICATION_TIMEOUT
+    )
+
+
+def _bearer_token() -> str | None:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+
+    if scheme.lower() != "bearer":
         return None
 
+    return token.strip()
+
 
 def require_login() -> None:
     r"""
     A `before_request` handler to require authentication on all routes.
-    """
-    auth_ = auth.get_auth()
 
+    The token is read straight from the `Authorization` header, rather than via
+    `auth.get_auth` and `auth.authenticate`, and the user is stored on `g` for
+    `authorise` to check, so that each request parses and verifies its token
+    only once.
+    """
     if request.method != "OPTIONS":
-        password = auth.get_auth_password(auth_)
+        token = _bearer_token()
 
-        user = auth.authenticate(auth_, password)
+        user = None if token is None else verify_token(token)
 
         if user is None:
             abort(401)
@@ -63,7 +157,10 @@ class UserRole(StrEnum):
     HEALTH_CHECK = "health_check"
 
 
-@dataclass(frozen=True)
+_ROLE_BY_VALUE = {role.value: role for role in UserRole}
+
+
+@dataclass(frozen=True, slots=True)
 class User:
     username: str
     roles: tuple[UserRole, ...]
@@ -75,43 +172,277 @@ JWT_ALGORITHM = "HS256"
 def encode_jwt(
     settings: Settings, user: User, duration: timedelta = timedelta(hours=1)
 ) -> str:
-    expiry_datetime = datetime.now(tz=timezone.utc) + duration
-
-    return jwt.encode(
-        {
-            "username": user.username,
-            "roles": [role.value for role in user.roles],
-            "exp": expiry_datetime.timestamp(),
-        },
-        settings.jwt_secret,
-        algorithm=JWT_ALGORITHM,
-    )
+    payload = {
+        "username": user.username,
+        "roles": [role.value for role in user.roles],
+        "exp": time.time() + duration.total_seconds(),
+    }
+
+    return _fast_encode_hs256(payload, settings.jwt_secret)
 
 
 class AuthenticationError(Exception):
     pass
 
 
-def decode_jwt(settings: Settings, token: str) -> User:
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    A small, thread-safe LRU cache whose entries expire after a given number of
+    seconds.
+
+    Expired entries are evicted lazily, i.e. when they are next looked up, or
+    when they fall off the end of the LRU order.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+
+            if time.monotonic() > expires_at:
+                del self._entries[key]
+
+                return None
+
+            self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        if ttl is None or ttl > self.ttl:
+            ttl = self.ttl
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+JWT_CACHE_SIZE = 10_000
+JWT_CACHE_TTL = 5.0
+
+_jwt_cache: TTLCache[bytes, User] = TTLCache(JWT_CACHE_SIZE, JWT_CACHE_TTL)
+
+INVALID_JWT_CACHE_SIZE = 4096
+INVALID_JWT_CACHE_TTL = 2.0
+
+_invalid_jwt_cache: TTLCache[bytes, str] = TTLCache(
+    INVALID_JWT_CACHE_SIZE, INVALID_JWT_CACHE_TTL
+)
+_invalid_jwt_cache_hits = count(1)
+
+
+@lru_cache(maxsize=4)
+def _cache_key_proto(secret: str) -> Any:
+    # BLAKE2b keys are limited to 64 bytes, so key with a digest of the secret
+    return hashlib.blake2b(
+        digest_size=16, key=hashlib.blake2b(secret.encode()).digest()
+    )
+
+
+def _jwt_cache_key(settings: Settings, token: str) -> bytes:
+    """
+    A digest of the token, keyed on the secret so that cached entries cannot
+    outlive a rotation of the secret.  The raw token is never held on to.
+    """
+    blake2b = _cache_key_proto(settings.jwt_secret).copy()
+    blake2b.update(token.encode())
+
+    return blake2b.digest()
+
+
+_URLSAFE_TO_STANDARD_B64 = bytes.maketrans(b"-_", b"+/")
+
+
+def _b64decode(segment: bytes) -> bytes:
+    # Equivalent to `base64.urlsafe_b64decode` on the padded segment, without
+    # its argument coercion
+    return binascii.a2b_base64(
+        segment.translate(_URLSAFE_TO_STANDARD_B64) + b"=" * (-len(segment) % 4)
+    )
+
+
+def _b64encode(data: bytes) -> bytes:
+    return urlsafe_b64encode(data).rstrip(b"=")
+
+
+# The header of every token that we issue, as serialised by PyJWT
+_JWT_HEADER_SEGMENT = _b64encode(b'{"alg":"HS256","typ":"JWT"}')
+
+
+def _validate_time_claims(payload: dict[str, Any], now: float) -> None:
+    # Mirrors the registered claim checks that PyJWT performs by default
     try:
-        payload = jwt.decode(
-            token, settings.jwt_secret, algorithms=[JWT_ALGORITHM]
+        if "iat" in payload and int(payload["iat"]) > now:
+            raise AuthenticationError("Invalid token")
+
+        if "nbf" in payload and int(payload["nbf"]) > now:
+            raise AuthenticationError("Invalid token")
+
+        if "exp" in payload and int(payload["exp"]) <= now:
+            raise AuthenticationError("Invalid token")
+    except (TypeError, ValueError) as exc:
+        raise AuthenticationError("Invalid token") from exc
+
+
+@lru_cache(maxsize=4)
+def _hmac_proto(secret: str) -> hmac.HMAC:
+    """
+    An HMAC-SHA256 keyed with `secret`, to be copied before use.
+
+    Copying skips encoding the secret and deriving the padded inner and outer
+    keys, which `hmac.new` would otherwise repeat for every token.
+    """
+    return hmac.new(secret.encode(), b"", hashlib.sha256)
+
+
+def _fast_encode_hs256(payload: dict[str, Any], secret: str) -> str:
+    """
+    Encode and sign an HS256 JWT, producing the same token as
+    `jwt.encode(payload, secret, algorithm="HS256")`.
+
+    The header is always the same, so is serialised once up front.
+    """
+    signing_input = b".".join(
+        (
+            _JWT_HEADER_SEGMENT,
+            _b64encode(json.dumps(payload, separators=(",", ":")).encode()),
         )
-    except jwt.InvalidTokenError as exc:
+    )
+
+    mac = _hmac_proto(secret).copy()
+    mac.update(signing_input)
+
+    return b".".join((signing_input, _b64encode(mac.digest()))).decode()
+
+
+def _fast_decode_hs256(token: str, secret: str) -> dict[str, Any]:
+    """
+    Verify and decode an HS256 signed JWT.
+
+    This is equivalent to `jwt.decode(token, secret, algorithms=["HS256"])`
+    but skips PyJWT's generic algorithm and option handling, which dominates
+    the cost of verifying the small tokens that we issue.
+    """
+    try:
+        signing_input, _, signature_segment = token.encode().rpartition(b".")
+        header_segment, payload_segment = signing_input.split(b".")
+
+        # Only parse headers that differ from those we issue ourselves
+        if header_segment != _JWT_HEADER_SEGMENT:
+            header = json.loads(_b64decode(header_segment))
+
+            if (
+                not isinstance(header, dict)
+                or header.get("alg") != JWT_ALGORITHM
+            ):
+                raise AuthenticationError("Invalid token")
+
+        signature = _b64decode(signature_segment)
+    except (ValueError, binascii.Error) as exc:
         raise AuthenticationError("Invalid token") from exc
 
+    mac = _hmac_proto(secret).copy()
+    mac.update(signing_input)
+
+    expected_signature = mac.digest()
+
+    if not hmac.compare_digest(expected_signature, signature):
+        raise AuthenticationError("Invalid token")
+
+    try:
+        payload = json.loads(_b64decode(payload_segment))
+    except (ValueError, binascii.Error) as exc:
+        raise AuthenticationError("Invalid token") from exc
+
+    if not isinstance(payload, dict):
+        raise AuthenticationError("Invalid token")
+
+    _validate_time_claims(payload, time.time())
+
+    return payload
+
+
+def _decode_jwt(settings: Settings, token: str) -> tuple[User, float | None]:
+    payload = _fast_decode_hs256(token, settings.jwt_secret)
+
     try:
-        return User(
+        user = User(
             username=payload["username"],
-            roles=tuple(UserRole(role) for role in payload["roles"]),
+            roles=tuple(_ROLE_BY_VALUE[role] for role in payload["roles"]),
         )
-    except (KeyError, ValueError) as exc:
+
+        # Like PyJWT, accept any expiry that converts to a number, such as
+        # the string "9999999999"
+        exp = payload.get("exp")
+        exp = None if exp is None else float(exp)
+    except (KeyError, TypeError, ValueError) as exc:
         raise AuthenticationError("Invalid token payload") from exc
 
+    return user, exp
+
+
+def decode_jwt(
+    settings: Settings, token: str, key: bytes | None = None
+) -> User:
+    """
+    Decode the JWT provided and return the associated user.
+
+    When `settings.jwt_cache_enabled` is set, successfully decoded users are
+    cached for a few seconds (and never beyond the expiry of the token) so
+    that clients reusing the same token skip repeated verification.  Callers
+    that have already computed the token's cache key may pass it as `key`.
+    """
+    if not settings.jwt_cache_enabled:
+        user, _exp = _decode_jwt(settings, token)
+
+        return user
+
+    if key is None:
+        key = _jwt_cache_key(settings, token)
+
+    user_ = _jwt_cache.get(key)
+
+    if user_ is not None:
+        return user_
+
+    user, exp = _decode_jwt(settings, token)
+
+    ttl = None if exp is None else exp - time.time()
+
+    _jwt_cache.set(key, user, ttl)
+
+    return user
+
 
 @auth.get_user_roles
 def get_user_roles(user: User) -> list[str]:
-    return [UserRole.ADMIN.value] + [role.value for role in user.roles]
+    # `UserRole` members are themselves strings, so need not be converted
+    return [UserRole.ADMIN, *user.roles]
 
 
 P = ParamSpec("P")
@@ -121,7 +452,32 @@ T = TypeVar("T")
 def authorise(
     *allowed_roles: UserRole,
 ) -> Callable[[Callable[P, T]], Callable[P, T]]:
-    return auth.login_required(role=[role.value for role in allowed_roles])
+    """
+    Restrict a view to users with any of `allowed_roles`.
+
+    Roles are checked against the user that `require_login` has already
+    authenticated, rather than via `auth.login_required`, which would parse
+    and verify the token a second time.
+    """
+    roles = [role.value for role in allowed_roles]
+
+    def decorator(f: Callable[P, T]) -> Callable[P, T]:
+        @wraps(f)
+        def decorated(*args: P.args, **kwargs: P.kwargs) -> T:
+            if request.method != "OPTIONS":
+                user = g.get("user")
+
+                if user is None:
+                    abort(401)
+
+                if not auth.authorize(roles, user, None):
+                    abort(403)
+
+            return f(*args, **kwargs)
+
+        return decorated
+
+    return decorator
 
 
 @click.argument("username", default="test")
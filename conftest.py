@@ -5,6 +5,7 @@ from flask import Flask
 from flask.testing import FlaskClient, FlaskCliRunner
 from flask_sqlalchemy import SQLAlchemy
 from flask_sqlalchemy.session import Session
+from sqlalchemy import event
 from sqlalchemy.orm import scoped_session
 
 from app import initialise_app
@@ -23,6 +24,14 @@ def settings(test_db_url: str) -> Settings:
     return Settings(db_url=test_db_url, test=True)  # type: ignore[call-arg]
 
 
+def _skip_syncing_test_database(dbapi_connection: Any, _record: Any) -> None:
+    # Factories commit every record they create, and the rows are cleared out
+    # for every test.  The test database need not survive a crash, so don't
+    # wait on the disk for each of these commits.
+    dbapi_connection.execute("PRAGMA synchronous = OFF")
+    dbapi_connection.execute("PRAGMA journal_mode = MEMORY")
+
+
 @pytest.fixture(autouse=True, scope="session")
 def app(settings: Settings) -> Generator[Flask]:
     app = Flask(__name__)
@@ -31,6 +40,9 @@ def app(settings: Settings) -> Generator[Flask]:
 
     initialise_app(app, settings)
 
+    with app.app_context():
+        event.listen(db.engine, "connect", _skip_syncing_test_database)
+
     yield app
 
 
@@ -40,14 +52,25 @@ def app_context(app: Flask) -> Generator[Flask]:
         yield app
 
 
+@pytest.fixture(scope="session")
+def schema(app: Flask) -> None:
+    with app.app_context():
+        db.drop_all()
+
+        db.create_all()
+
+
 @pytest.fixture
 def db_(
     app_context: Flask,
     settings: Settings,
+    schema: None,
 ) -> Generator[SQLAlchemy]:
-    db.drop_all()
-
-    db.create_all()
+    # The schema is created once per session, so only clear out the rows left
+    # behind by the previous test
+    with db.engine.begin() as connection:
+        for table in reversed(db.metadata.sorted_tables):
+            connection.execute(table.delete())
 
     yield db
 
@@ -1,9 +1,15 @@
 from typing import Any
 
-from werkzeug.routing import IntegerConverter, Map
+from werkzeug.routing import IntegerConverter, Map, ValidationError
 
 SQLITE_MAX_ID_SIZE = (2**63) - 1  # Ensure that IDs are not too big for SQLite
 
+ID_PARAMETER_SCHEMA: dict[str, Any] = {
+    "type": "integer",
+    "minimum": 1,
+    "maximum": SQLITE_MAX_ID_SIZE,
+}
+
 
 class IdConverter(IntegerConverter):
     def __init__(
@@ -12,6 +18,16 @@ class IdConverter(IntegerConverter):
     ) -> None:
         super().__init__(map, min=1, max=SQLITE_MAX_ID_SIZE)
 
+    def to_python(self, value: str) -> int:
+        # The rule's regex only matches digits, so we can skip the generic
+        # checks made by `NumberConverter.to_python`
+        id_ = int(value)
+
+        if not 1 <= id_ <= SQLITE_MAX_ID_SIZE:
+            raise ValidationError()
+
+        return id_
+
 
 def id_converter_params(_converter: IdConverter) -> dict[str, Any]:
-    return {"type": "integer", "minimum": 1, "maximum": SQLITE_MAX_ID_SIZE}
+    return ID_PARAMETER_SCHEMA
@@ -0,0 +1,48 @@
+from flask_smorest.pagination import PaginationParameters
+from flask_sqlalchemy.pagination import Pagination, SelectPagination
+from sqlalchemy import Select
+
+from db import db
+from settings import Settings
+
+_max_per_page: int | None = None
+
+
+def configure_pagination(settings_: Settings) -> None:
+    """
+    Bind the pagination settings, so that list endpoints need not look them up
+    via `current_app` on every request.  Called by `initialise_app`.
+    """
+    global _max_per_page
+
+    _max_per_page = settings_.max_per_page
+
+
+def max_per_page() -> int | None:
+    return _max_per_page
+
+
+class _SelectPagination(SelectPagination):
+    def _query_count(self) -> int:
+        # A page that is not full is the last, so the total follows from it
+        # without counting.  An empty page other than the first is a 404.
+        if len(self.items) < self.per_page:
+            return self._query_offset + len(self.items)
+
+        return super()._query_count()
+
+
+def paginate(
+    select: Select, pagination_parameters: PaginationParameters
+) -> Pagination:
+    page = _SelectPagination(
+        select=select,
+        session=db.session(),
+        page=pagination_parameters.page,
+        per_page=pagination_parameters.page_size,
+        max_per_page=_max_per_page,
+    )
+
+    pagination_parameters.item_count = page.total
+
+    return page
@@ -1,12 +1,17 @@
+from collections.abc import Mapping
 from enum import StrEnum
 from typing import Any, cast
 
 from marshmallow import Schema
 from marshmallow.fields import Enum, Integer, Nested, String
-from marshmallow.validate import Regexp
+from marshmallow.validate import Range, Regexp
+from webargs.fields import DelimitedList
 
+from converters import SQLITE_MAX_ID_SIZE
+from firewalls.flask.schemas.codegen import compile_dumper
 from firewalls.flask.validations import (
     IsValidIPAddressOrSubnetCIDR,
+    fits_on_a_page,
     is_valid_tcp_port,
 )
 from firewalls.models import IP_REGEX
@@ -17,6 +22,51 @@ class BaseSchema(Schema):
         ordered = True
         unknown = "exclude"  # This allows the API to be forward compatible
 
+    def dump(self, obj: Any, *, many: bool | None = None) -> Any:
+        many = self.many if many is None else bool(many)
+        dumper = compile_dumper(self)
+
+        if (
+            dumper is not None
+            and obj is not None
+            and not _is_mapping(obj, many)
+        ):
+            try:
+                if many:
+                    return [dumper(o) for o in obj]
+
+                return dumper(obj)
+            except AttributeError:
+                # Attributes that are missing are omitted from, or defaulted
+                # in, the output.  Leave marshmallow to work out which.
+                pass
+
+        return super().dump(obj, many=many)
+
+
+def _is_mapping(obj: Any, many: bool) -> bool:
+    if many:
+        return any(isinstance(o, Mapping) for o in obj)
+
+    return isinstance(obj, Mapping)
+
+
+class _PageSchema(Schema):
+    def dump(self, obj: Any, *, many: bool | None = None) -> Any:
+        if many or (many is None and self.many):
+            return super().dump(obj, many=many)
+
+        # A page is always a single object, so build it directly and leave
+        # the nested schema to dump all of the items in one call
+        items = self.fields["items"].schema  # type: ignore[attr-defined]
+
+        return {
+            "items": items.dump(obj.items, many=True),
+            "total": obj.total,
+            "page": obj.page,
+            "per_page": obj.per_page,
+        }
+
 
 def page_schema(schema_type: type[Schema]) -> type[Schema]:
     schema_prefix = schema_type.__name__
@@ -28,7 +78,7 @@ def page_schema(schema_type: type[Schema]) -> type[Schema]:
         type[Schema],
         type(
             f"{schema_prefix}PageSchema",
-            (Schema,),
+            (_PageSchema,),
             {
                 "items": Nested(schema_type, many=True),
                 "total": Integer(),
@@ -121,7 +171,21 @@ PortField = port_field
 
 
 class QueryParametersSchema(Schema):
-    pass
+    ids = DelimitedList(
+        Integer(validate=Range(1, SQLITE_MAX_ID_SIZE)),
+        validate=fits_on_a_page,
+        metadata={"description": "Only include records with these IDs"},
+    )
+    after_id = Integer(
+        validate=Range(0, SQLITE_MAX_ID_SIZE),
+        metadata={
+            "description": (
+                "Only include records with IDs greater than this.  When "
+                "ordering by ID, pass the last ID of one page to fetch the "
+                "next without skipping over the rows before it"
+            )
+        },
+    )
 
 
 def order_by_enum(
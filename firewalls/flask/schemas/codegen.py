@@ -0,0 +1,135 @@
+from typing import Any, Callable
+
+from marshmallow import Schema
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+from marshmallow.fields import Enum, Field, Integer, Nested, String
+
+Dumper = Callable[[Any], dict[str, Any]]
+
+_dumpers: dict[type[Schema], Dumper | None] = {}
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def compile_dumper(schema: Schema) -> Dumper | None:
+    """
+    Generate a function that dumps a single object exactly as `schema` would,
+    but with the per-field dispatch done once, up front, rather than for every
+    object.
+
+    Returns `None` for schemas that the generated code cannot reproduce, e.g.
+    those with dump hooks, `only`/`exclude` options or unsupported fields.
+    These should be dumped by marshmallow itself.  Dumpers are memoized on the
+    schema class, so neither are instances whose `load_only`/`dump_only`
+    differ from those of their class.
+    """
+    if (
+        schema.only is not None
+        or schema.exclude
+        or set(schema.load_only) != set(schema.opts.load_only)
+        or set(schema.dump_only) != set(schema.opts.dump_only)
+    ):
+        return None
+
+    schema_type = type(schema)
+
+    if schema_type not in _dumpers:
+        try:
+            _dumpers[schema_type] = _compile(schema)
+        except _Unsupported:
+            _dumpers[schema_type] = None
+
+    return _dumpers[schema_type]
+
+
+def _compile(schema: Schema) -> Dumper:
+    if (
+        schema._hooks[PRE_DUMP]
+        or schema._hooks[POST_DUMP]
+        or type(schema).get_attribute is not Schema.get_attribute
+        or schema.dict_class is not dict
+    ):
+        raise _Unsupported()
+
+    namespace: dict[str, Any] = {}
+    lines = []
+    items = []
+
+    for i, (name, field) in enumerate(schema.dump_fields.items()):
+        attribute = field.attribute or name
+
+        # Mappings are dumped by key rather than by attribute, so reject any
+        # attribute that a `dict` would answer
+        if not attribute.isidentifier() or hasattr(dict, attribute):
+            raise _Unsupported()
+
+        key = field.data_key if field.data_key is not None else name
+
+        lines.append(f"    v{i} = obj.{attribute}")
+        items.append(
+            f"        {key!r}: {_expression(field, f'v{i}', namespace)},"
+        )
+
+    source = "\n".join(
+        ["def dump(obj):", *lines, "    return {", *items, "    }"]
+    )
+
+    exec(
+        compile(source, f"<{type(schema).__name__} dumper>", "exec"), namespace
+    )
+
+    return namespace["dump"]  # type: ignore[no-any-return]
+
+
+def _expression(field: Field, value: str, namespace: dict[str, Any]) -> str:
+    field_type = type(field)
+
+    if field_type in (Integer, String):
+        # Values of the expected type dump as themselves, anything else is left
+        # to the field to convert
+        native_type = int if field_type is Integer else str
+
+        if field_type is Integer and field.as_string:  # type: ignore[attr-defined]
+            raise _Unsupported()
+
+        serialize = f"_serialize_{len(namespace)}"
+        namespace[serialize] = field._serialize
+
+        return (
+            f"{value} if {value}.__class__ is {native_type.__name__} "
+            f"else {serialize}({value}, None, obj)"
+        )
+
+    if field_type is Enum:
+        if field.by_value:  # type: ignore[attr-defined]
+            raise _Unsupported()
+
+        return f"None if {value} is None else {value}.name"
+
+    if field_type is Nested:
+        nested = field.nested  # type: ignore[attr-defined]
+
+        if (
+            not isinstance(nested, type)
+            or field.only is not None  # type: ignore[attr-defined]
+            or field.exclude  # type: ignore[attr-defined]
+        ):
+            raise _Unsupported()
+
+        nested_schema = field.schema  # type: ignore[attr-defined]
+        nested_dumper = compile_dumper(nested_schema)
+
+        if nested_dumper is None:
+            raise _Unsupported()
+
+        dump = f"_dump_{len(namespace)}"
+        namespace[dump] = nested_dumper
+
+        if nested_schema.many or field.many:  # type: ignore[attr-defined]
+            return f"None if {value} is None else [{dump}(o) for o in {value}]"
+
+        return f"None if {value} is None else {dump}({value})"
+
+    raise _Unsupported()
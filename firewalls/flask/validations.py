@@ -1,13 +1,13 @@
-from typing import ClassVar, overload
+from typing import ClassVar, Sized, overload
 
 from marshmallow import ValidationError
-from marshmallow.validate import Range, Regexp
+from marshmallow.validate import Length, Range, Regexp
 
-from firewalls import models
+from firewalls.flask.pagination import max_per_page
 from firewalls.models import (
     ADDRESS_REGEX,
     VALID_TCP_PORT_RANGE,
-    validate_ip_address_or_subnet_cidr,
+    is_valid_ip_address_or_subnet_cidr,
 )
 
 
@@ -36,15 +36,24 @@ class IsValidIPAddressOrSubnetCIDR(Regexp):
         if isinstance(value, bytes):  # pragma: no cover
             value = value.decode("utf-8")
 
-        try:
-            validate_ip_address_or_subnet_cidr(value)
-        except models.ValidationError:
-            raise ValidationError(self._format_error(value))
+        if is_valid_ip_address_or_subnet_cidr(value):
+            return value
 
-        return value
+        raise ValidationError(self._format_error(value))
 
 
 def is_valid_tcp_port() -> Range:
     return Range(
         *VALID_TCP_PORT_RANGE, error="{input} is not a valid TCP port number"
     )
+
+
+def fits_on_a_page(value: Sized) -> None:
+    """
+    Reject lists longer than the largest page, e.g. of IDs to filter on, so
+    that a single query string cannot bind an unbounded number of parameters.
+    """
+    max_ = max_per_page()
+
+    if max_ is not None:
+        Length(max=max_)(value)
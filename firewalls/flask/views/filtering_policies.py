@@ -1,6 +1,5 @@
 from typing import Any
 
-from flask import current_app
 from flask.views import MethodView
 from flask_smorest import Blueprint
 from flask_smorest.error_handler import ErrorSchema
@@ -12,11 +11,14 @@ from auth import UserRole, authorise
 from db import db
 from firewalls.flask.exceptions import abort_integrity_error, abort_not_found
 from firewalls.flask.links import links, operation
+from firewalls.flask.pagination import paginate
 from firewalls.flask.schemas.base import PageSchema
 from firewalls.models import FilteringPolicy, Packet
 from firewalls.repositories import (
+    RULE_OPTIONS,
     FirewallRepository,
     NestedFilteringPolicyRepository,
+    NestedFirewallRuleRepository,
 )
 from firewalls.use_cases import (
     CreateFilteringPolicy,
@@ -50,7 +52,9 @@ filtering_policies.register_blueprint(rules)
 class FilteringPolicies(MethodView):
 
     @authorise(UserRole.VIEWER)
-    @filtering_policies.arguments(FilteringPolicyFilterSchema, location="query")
+    @filtering_policies.arguments(
+        FilteringPolicyFilterSchema(), location="query"
+    )
     @filtering_policies.response(200, PageSchema(FilteringPolicySchema))
     @filtering_policies.paginate()
     def get(
@@ -62,20 +66,9 @@ class FilteringPolicies(MethodView):
         """
         Fetch a paginated list of `FilteringPolicy` records
         """
-        settings = current_app.config["SETTINGS"]
-
         repository = NestedFilteringPolicyRepository(firewall_id, db)
 
-        page = db.paginate(
-            repository.filter(**args),
-            page=pagination_parameters.page,
-            per_page=pagination_parameters.page_size,
-            max_per_page=settings.max_per_page,
-        )
-
-        pagination_parameters.item_count = page.total
-
-        return page
+        return paginate(repository.filter(**args), pagination_parameters)
 
     @authorise(UserRole.EDITOR)
     @links(
@@ -99,7 +92,7 @@ class FilteringPolicies(MethodView):
         },
     )
     @operation(filtering_policies, "createFilteringPolicy")
-    @filtering_policies.arguments(FilteringPolicySchema)
+    @filtering_policies.arguments(FilteringPolicySchema())
     @filtering_policies.response(201, FilteringPolicySchema)
     @filtering_policies.alt_response(404, schema=ErrorSchema)
     @filtering_policies.alt_response(409, schema=ErrorSchema)
@@ -187,7 +180,7 @@ class FilteringPolicyById(MethodView):
 @filtering_policies.route("/<id:filtering_policy_id>/inspections/")
 class FirewallInspections(MethodView):
     @authorise(UserRole.VIEWER)
-    @filtering_policies.arguments(PacketSchema, location="query")
+    @filtering_policies.arguments(PacketSchema(), location="query")
     @filtering_policies.response(200, InspectionSchema)
     @filtering_policies.alt_response(404, schema=ErrorSchema)
     def get(
@@ -197,7 +190,10 @@ class FirewallInspections(MethodView):
         Determine the action taken and rule applied by a `FilteringPolicy` for
         a given packet
         """
-        repository = NestedFilteringPolicyRepository(firewall_id, db)
+        # Only the rules that could match the packet are loaded, below
+        repository = NestedFilteringPolicyRepository(
+            firewall_id, db, options=[]
+        )
 
         try:
             filtering_policy = repository.get(filtering_policy_id)
@@ -215,6 +211,13 @@ class FirewallInspections(MethodView):
             destination_port=args["destination_port"],
         )
 
-        inspection = filtering_policy.inspect(packet)
+        rule_repository = NestedFirewallRuleRepository(
+            firewall_id, filtering_policy_id, db, options=RULE_OPTIONS
+        )
+        candidate_rules = db.session.scalars(
+            rule_repository.select_candidates(packet)
+        )
+
+        inspection = filtering_policy.inspect(packet, candidate_rules)
 
         return inspection
@@ -1,6 +1,5 @@
 from typing import Any
 
-from flask import current_app
 from flask.views import MethodView
 from flask_smorest import Blueprint
 from flask_smorest.error_handler import ErrorSchema
@@ -15,6 +14,7 @@ from firewalls.flask.exceptions import (
     abort_not_found,
 )
 from firewalls.flask.links import links, operation
+from firewalls.flask.pagination import paginate
 from firewalls.flask.schemas.base import PageSchema
 from firewalls.models import Firewall
 from firewalls.repositories import FirewallRepository
@@ -45,7 +45,7 @@ firewalls.before_request(require_login)
 class Firewalls(MethodView):
 
     @authorise(UserRole.VIEWER)
-    @firewalls.arguments(FirewallFilterSchema, location="query")
+    @firewalls.arguments(FirewallFilterSchema(), location="query")
     @firewalls.response(200, PageSchema(FirewallSchema))
     @firewalls.paginate()
     def get(
@@ -56,20 +56,9 @@ class Firewalls(MethodView):
         """
         Fetch a paginated list of `Firewall` records
         """
-        settings = current_app.config["SETTINGS"]
-
         repository = FirewallRepository(db)
 
-        page = db.paginate(
-            repository.filter(**args),
-            page=pagination_parameters.page,
-            per_page=pagination_parameters.page_size,
-            max_per_page=settings.max_per_page,
-        )
-
-        pagination_parameters.item_count = page.total
-
-        return page
+        return paginate(repository.filter(**args), pagination_parameters)
 
     @authorise(UserRole.EDITOR)
     @links(
@@ -87,7 +76,7 @@ class Firewalls(MethodView):
         {"firewall_id": ("id",)},
     )
     @operation(firewalls, "createFirewall")
-    @firewalls.arguments(FirewallSchema)
+    @firewalls.arguments(FirewallSchema())
     @firewalls.response(201, FirewallSchema)
     @firewalls.alt_response(404, schema=ErrorSchema)
     @firewalls.alt_response(422, schema=ErrorSchema)
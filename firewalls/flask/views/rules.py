@@ -1,17 +1,18 @@
 from typing import Any
 
-from flask import current_app
 from flask.views import MethodView
 from flask_smorest import Blueprint
 from flask_smorest.error_handler import ErrorSchema
 from flask_smorest.pagination import PaginationParameters
 from flask_sqlalchemy.pagination import Pagination
 from sqlalchemy.exc import IntegrityError, NoResultFound
+from sqlalchemy.orm import contains_eager, raiseload
 
 from auth import UserRole, authorise
 from db import db
 from firewalls.flask.exceptions import abort_integrity_error, abort_not_found
 from firewalls.flask.links import links, operation
+from firewalls.flask.pagination import paginate
 from firewalls.flask.schemas.base import (
     PageSchema,
 )
@@ -20,6 +21,7 @@ from firewalls.flask.schemas.rule_schema import (
     FirewallRuleSchema,
 )
 from firewalls.models import (
+    FilteringPolicy,
     FirewallRule,
 )
 from firewalls.repositories import (
@@ -47,7 +49,7 @@ rules = Blueprint(
 class FirewallRules(MethodView):
 
     @authorise(UserRole.VIEWER)
-    @rules.arguments(FirewallRuleFilterSchema, location="query")
+    @rules.arguments(FirewallRuleFilterSchema(), location="query")
     @rules.response(200, PageSchema(FirewallRuleSchema))
     @rules.paginate()
     def get(
@@ -60,22 +62,11 @@ class FirewallRules(MethodView):
         """
         Fetch a paginated list of `FirewallRule` records
         """
-        settings = current_app.config["SETTINGS"]
-
         repository = NestedFirewallRuleRepository(
             firewall_id, filtering_policy_id, db
         )
 
-        page = db.paginate(
-            repository.filter(**args),
-            page=pagination_parameters.page,
-            per_page=pagination_parameters.page_size,
-            max_per_page=settings.max_per_page,
-        )
-
-        pagination_parameters.item_count = page.total
-
-        return page
+        return paginate(repository.filter(**args), pagination_parameters)
 
     @authorise(UserRole.EDITOR)
     @links(
@@ -101,7 +92,7 @@ class FirewallRules(MethodView):
         },
     )
     @operation(rules, "createRule")
-    @rules.arguments(FirewallRuleSchema)
+    @rules.arguments(FirewallRuleSchema())
     @rules.response(201, FirewallRuleSchema)
     @rules.alt_response(404, schema=ErrorSchema)
     @rules.alt_response(409, schema=ErrorSchema)
@@ -114,8 +105,19 @@ class FirewallRules(MethodView):
         """
         Create a new `FirewallRule` record
         """
+        # The new rule only needs its policy and firewall, not the policy's
+        # existing rules.  The firewall is already joined to scope the query.
+        filtering_policy_repository = NestedFilteringPolicyRepository(
+            firewall_id,
+            db,
+            options=[
+                contains_eager(FilteringPolicy.firewall),
+                raiseload("*", sql_only=True),
+            ],
+        )
+
         create_firewall_rule = CreateFirewallRule(
-            NestedFilteringPolicyRepository(firewall_id, db), db
+            filtering_policy_repository, db
         )
 
         try:
@@ -3,10 +3,18 @@ from __future__ import annotations
 from abc import abstractmethod
 from dataclasses import dataclass
 from enum import StrEnum
-from ipaddress import ip_address, ip_network
-from typing import Self
-
-from sqlalchemy import ForeignKey, UniqueConstraint
+from functools import lru_cache
+from ipaddress import (
+    IPv4Address,
+    IPv4Network,
+    IPv6Address,
+    IPv6Network,
+    ip_address,
+    ip_network,
+)
+from typing import Iterable, Self
+
+from sqlalchemy import ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, validates
 
 from db import BaseModel, db
@@ -71,14 +79,27 @@ class FilteringPolicy(BaseModel):
 
     rules: Mapped[list[FirewallRule]] = db.relationship(  # type: ignore[assignment]
         back_populates="filtering_policy",
+        order_by="(FirewallRule.priority, FirewallRule.id)",
     )
 
     @property
     def prioritised_rules(self) -> list[FirewallRule]:
+        # Rules are loaded in priority order, which makes this sort linear, but
+        # those appended since are not
         return sorted(self.rules, key=lambda rule: rule.priority)
 
-    def inspect(self, packet: Packet) -> Inspection:
-        for rule in self.prioritised_rules:
+    def inspect(
+        self, packet: Packet, rules: Iterable[FirewallRule] | None = None
+    ) -> Inspection:
+        """
+        Apply the first of `rules` that matches `packet`, or else the default
+        action.  `rules` should be in priority order and defaults to all those
+        of the policy.
+        """
+        if rules is None:
+            rules = self.prioritised_rules
+
+        for rule in rules:
             action = rule.inspect(packet)
 
             if action is not None:
@@ -90,6 +111,13 @@ class FilteringPolicy(BaseModel):
         UniqueConstraint(
             "name", "firewall_id", name="unique_name_and_firewall_id"
         ),
+        # Policies are listed by firewall, excluding those soft-deleted
+        Index(
+            "ix_filtering_policies_firewall_id_deleted_at_id",
+            "firewall_id",
+            "deleted_at",
+            "id",
+        ),
     )
 
 
@@ -125,21 +153,36 @@ def validate_port(port: int) -> int:
     raise ValidationError(f"{port} is not a valid port number")
 
 
-def validate_ip_address_or_subnet_cidr(address: str) -> str:
-    errors: list[str] = []
-
+@lru_cache(maxsize=4096)
+def is_valid_ip_address_or_subnet_cidr(address: str) -> bool:
+    # Addresses repeat heavily across rules, so parse each one only once.  Only
+    # subnet CIDRs contain a slash, so parse each as what it must be rather
+    # than failing over from one to the other.
     try:
-        ip_address(address)
-    except ValueError as exc:
-        errors.append(str(exc))
-    else:
-        return address
+        if "/" in address:
+            ip_network(address)
+        else:
+            ip_address(address)
+    except ValueError:
+        return False
 
-    try:
-        ip_network(address)
-    except ValueError as exc:
-        errors.append(str(exc))
-    else:
+    return True
+
+
+# Rules and packets are matched repeatedly against the same addresses, so parse
+# each of them only once.  An IP address is parsed as a network of one address.
+@lru_cache(maxsize=4096)
+def parse_ip_network(address: str) -> IPv4Network | IPv6Network:
+    return ip_network(address)
+
+
+@lru_cache(maxsize=4096)
+def parse_ip_address(address: str) -> IPv4Address | IPv6Address:
+    return ip_address(address)
+
+
+def validate_ip_address_or_subnet_cidr(address: str) -> str:
+    if is_valid_ip_address_or_subnet_cidr(address):
         return address
 
     raise ValidationError(f"{address} is not a valid IP address or subnet CIDR")
@@ -228,6 +271,15 @@ class FirewallRule(BaseModel):
             "filtering_policy_id",
             name="unique_filtering_policy_action_sources_destinations_ports",
         ),
+        # Rules are listed by policy, excluding those soft-deleted, and are
+        # applied in priority order
+        Index(
+            "ix_firewall_rules_filtering_policy_id_deleted_at_priority_id",
+            "filtering_policy_id",
+            "deleted_at",
+            "priority",
+            "id",
+        ),
     )
 
 
@@ -253,21 +305,12 @@ class FirewallRuleNetworkAddress(BaseModel):
     def validate_port(self, _key: str, port: int) -> int:
         return validate_port(port)
 
-    @property
-    def is_ip(self) -> bool:
+    def ip_matches(self, ip: str) -> bool:
         try:
-            ip_address(self.address)
+            return parse_ip_address(ip) in parse_ip_network(self.address)
         except ValueError:
             return False
 
-        return True
-
-    def ip_matches(self, ip: str) -> bool:
-        if self.is_ip:
-            return ip == self.address
-
-        return ip_address(ip) in ip_network(self.address)
-
     def port_matches(self, port: int) -> bool:
         return port == self.port
 
@@ -1,8 +1,12 @@
 from enum import StrEnum
 from typing import Any, Iterable, cast
 
-from sqlalchemy import Select
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy import ColumnElement, Select, and_, exists, or_
+from sqlalchemy.orm import (
+    contains_eager,
+    raiseload,
+    selectinload,
+)
 
 from firewalls.models import (
     FilteringPolicy,
@@ -11,6 +15,7 @@ from firewalls.models import (
     FirewallRuleDestination,
     FirewallRulePort,
     FirewallRuleSource,
+    Packet,
 )
 from repository import Repository
 
@@ -31,13 +36,25 @@ def order_by_enum(name: str, attrs: Iterable[str]) -> type[StrEnum]:
 FirewallOrderBy = order_by_enum("FirewallOrderBy", ["name"])
 
 
+# Load the relationships of rules that are included in responses.  Repositories
+# end their options with a raiseload, so that any relationship they do not load
+# fails loudly rather than being lazy loaded one query at a time.  Those found in
+# the identity map are still returned.
+RULE_OPTIONS = [
+    selectinload(FirewallRule.sources),
+    selectinload(FirewallRule.destinations),
+    selectinload(FirewallRule.ports),
+]
+
+
 class FirewallRepository(Repository):
     model_type = Firewall
 
     default_options = [
-        selectinload(Firewall.filtering_policies).selectinload(
-            FilteringPolicy.rules
-        )
+        selectinload(Firewall.filtering_policies)
+        .selectinload(FilteringPolicy.rules)
+        .options(*RULE_OPTIONS),
+        raiseload("*", sql_only=True),
     ]
 
 
@@ -52,25 +69,25 @@ class NestedFilteringPolicyRepository(Repository):
 
         self.firewall_id = firewall_id
 
+    # The firewall is joined anyway, to exclude policies of deleted firewalls
     default_options = [
-        joinedload(FilteringPolicy.firewall),
-        selectinload(FilteringPolicy.rules),
+        contains_eager(FilteringPolicy.firewall),
+        selectinload(FilteringPolicy.rules).options(*RULE_OPTIONS),
+        raiseload("*", sql_only=True),
     ]
 
     model_type = FilteringPolicy
 
-    def select_all(self) -> Select:
-        select_ = (
+    def select_unscoped(self) -> Select:
+        return (
             super()
-            .select_all()
+            .select_unscoped()
             .join(Firewall, Firewall.id == FilteringPolicy.firewall_id)
-            .where(
-                Firewall.id == self.firewall_id,
-                Firewall.deleted_at.is_(None),
-            )
+            .where(Firewall.deleted_at.is_(None))
         )
 
-        return select_
+    def scope(self) -> list[ColumnElement[bool]]:
+        return [Firewall.id == self.firewall_id]
 
 
 FirewallRuleOrderBy = order_by_enum(
@@ -93,19 +110,20 @@ class NestedFirewallRuleRepository(Repository[FirewallRule]):
 
     model_type = FirewallRule
 
+    # The policy and firewall are joined anyway, to exclude rules of deleted
+    # ones
     default_options = [
-        joinedload(FirewallRule.filtering_policy).joinedload(
+        contains_eager(FirewallRule.filtering_policy).contains_eager(
             FilteringPolicy.firewall
         ),
-        selectinload(FirewallRule.sources),
-        selectinload(FirewallRule.destinations),
-        selectinload(FirewallRule.ports),
+        *RULE_OPTIONS,
+        raiseload("*", sql_only=True),
     ]
 
-    def select_all(self) -> Select:
+    def select_unscoped(self) -> Select:
         return (
             super()
-            .select_all()
+            .select_unscoped()
             .join(
                 FilteringPolicy,
                 FilteringPolicy.id == FirewallRule.filtering_policy_id,
@@ -115,15 +133,17 @@ class NestedFirewallRuleRepository(Repository[FirewallRule]):
                 Firewall.id == FilteringPolicy.firewall_id,
             )
             .where(
-                Firewall.id == self.firewall_id,
                 Firewall.deleted_at.is_(None),
-            )
-            .where(
-                FilteringPolicy.id == self.filtering_policy_id,
                 FilteringPolicy.deleted_at.is_(None),
             )
         )
 
+    def scope(self) -> list[ColumnElement[bool]]:
+        return [
+            Firewall.id == self.firewall_id,
+            FilteringPolicy.id == self.filtering_policy_id,
+        ]
+
     def filter(
         self,
         *,
@@ -136,43 +156,70 @@ class NestedFirewallRuleRepository(Repository[FirewallRule]):
     ) -> Select:
         select_ = super().filter(**filters)
 
-        select_ = (
-            select_.join(
+        # Filter on related records with EXISTS rather than outer joins, which
+        # yield a row per combination of them that DISTINCT must then remove.
+        # An address and a port must both match the same source/destination.
+        related_filters: list[tuple[Any, dict[str, Any]]] = [
+            (
                 FirewallRuleSource,
-                FirewallRuleSource.firewall_rule_id == FirewallRule.id,
-                isouter=True,
-            )
-            .join(
+                {"address": source_address, "port": source_port},
+            ),
+            (
                 FirewallRuleDestination,
-                FirewallRuleDestination.firewall_rule_id == FirewallRule.id,
-                isouter=True,
-            )
-            .join(
-                FirewallRulePort,
-                FirewallRulePort.firewall_rule_id == FirewallRule.id,
-                isouter=True,
-            )
-        )
-
-        if source_address is not None:
-            select_ = select_.where(
-                FirewallRuleSource.address == source_address
-            )
+                {"address": destination_address, "port": destination_port},
+            ),
+            (FirewallRulePort, {"number": port}),
+        ]
+
+        for model_type, values in related_filters:
+            criteria = [
+                getattr(model_type, attr) == value
+                for attr, value in values.items()
+                if value is not None
+            ]
+
+            if criteria:
+                select_ = select_.where(
+                    exists().where(
+                        model_type.firewall_rule_id == FirewallRule.id,
+                        *criteria,
+                    )
+                )
 
-        if source_port is not None:
-            select_ = select_.where(FirewallRuleSource.port == source_port)
-
-        if destination_address is not None:
-            select_ = select_.where(
-                FirewallRuleDestination.address == destination_address
-            )
+        return select_
 
-        if destination_port is not None:
+    def select_candidates(self, packet: Packet) -> Select:
+        """
+        Select the rules that could match `packet`, in priority order.
+
+        Rules with a source or destination whose port or, unless it is a subnet,
+        whose address differs from the packet's cannot match it and so are
+        excluded by the database.  Subnets are left to `FirewallRule.matches`.
+        Addresses are compared as text, which relies on the packet's being in
+        the canonical form that `PacketSchema` validates.
+        Like `FilteringPolicy.rules`, this includes soft-deleted rules.
+        """
+        select_ = self.select_all()
+
+        for model_type, address, port in (
+            (FirewallRuleSource, packet.source_address, packet.source_port),
+            (
+                FirewallRuleDestination,
+                packet.destination_address,
+                packet.destination_port,
+            ),
+        ):
             select_ = select_.where(
-                FirewallRuleDestination.port == destination_port
+                ~exists().where(
+                    model_type.firewall_rule_id == FirewallRule.id,
+                    or_(
+                        model_type.port != port,
+                        and_(
+                            ~model_type.address.contains("/"),
+                            model_type.address != address,
+                        ),
+                    ),
+                )
             )
 
-        if port is not None:
-            select_ = select_.where(FirewallRulePort.number == port)
-
-        return select_.distinct()
+        return select_.order_by(FirewallRule.priority, FirewallRule.id)
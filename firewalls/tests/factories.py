@@ -36,7 +36,7 @@ class FirewallFactory(BaseFactory):
 
 class FilteringPolicyFactory(BaseFactory):
     name = Faker("word")
-    default_action = FuzzyChoice(list(FirewallAction))
+    default_action = FuzzyChoice(FirewallAction)
 
     firewall = SubFactory(FirewallFactory)
 
@@ -57,9 +57,8 @@ class FilteringPolicyFactory(BaseFactory):
                 for _ in range(size)
             ]
 
-        for rule in extracted:
-            with db.session.no_autoflush:
-                filtering_policy.rules.append(rule)
+        with db.session.no_autoflush:
+            filtering_policy.rules.extend(extracted)
 
     class Meta:
         model = FilteringPolicy
@@ -82,7 +81,7 @@ class FirewallRuleFactory(Factory):
         size=2,
     )
 
-    action = FuzzyChoice(list(FirewallAction))
+    action = FuzzyChoice(FirewallAction)
 
     priority = Sequence(lambda n: n)
 
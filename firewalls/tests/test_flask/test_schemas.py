@@ -0,0 +1,184 @@
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from flask_sqlalchemy import SQLAlchemy
+from marshmallow import Schema, post_dump
+from marshmallow.fields import Boolean, Enum, Integer, Nested, String
+
+from firewalls.flask.schemas import (
+    FilteringPolicySchema,
+    FirewallRuleSchema,
+    FirewallSchema,
+)
+from firewalls.flask.schemas.base import BaseSchema, PageSchema
+from firewalls.flask.schemas.codegen import compile_dumper
+from firewalls.models import FirewallAction
+from firewalls.tests.factories import FirewallFactory
+
+
+@pytest.fixture
+def firewalls(db_: SQLAlchemy) -> list[Any]:
+    return FirewallFactory.create_batch(2)
+
+
+@pytest.mark.parametrize(
+    "schema_type, objects",
+    [
+        (FirewallSchema, lambda firewalls: firewalls),
+        (
+            FilteringPolicySchema,
+            lambda firewalls: firewalls[0].filtering_policies,
+        ),
+        (
+            FirewallRuleSchema,
+            lambda firewalls: firewalls[0].filtering_policies[0].rules,
+        ),
+    ],
+)
+def test_compiled_dumpers_match_marshmallow(
+    firewalls: list[Any], schema_type: type[Schema], objects: Any
+) -> None:
+    schema = schema_type()
+
+    assert compile_dumper(schema) is not None
+
+    assert schema.dump(objects(firewalls), many=True) == Schema.dump(
+        schema, objects(firewalls), many=True
+    )
+
+
+def test_pages_are_dumped_as_marshmallow_would(firewalls: list[Any]) -> None:
+    page = SimpleNamespace(items=firewalls, total=2, page=1, per_page=10)
+    schema = PageSchema(FirewallSchema)()
+
+    assert schema.dump(page) == Schema.dump(schema, page)
+
+
+def test_many_pages_are_dumped_by_marshmallow(firewalls: list[Any]) -> None:
+    page = SimpleNamespace(items=firewalls, total=2, page=1, per_page=10)
+    schema = PageSchema(FirewallSchema)(many=True)
+
+    assert schema.dump([page]) == Schema.dump(schema, [page])
+
+
+class ThingSchema(BaseSchema):
+    id = Integer()
+    name = String(data_key="title")
+    action = Enum(FirewallAction)
+
+
+def test_values_of_other_types_are_converted_by_their_field() -> None:
+    thing = SimpleNamespace(id="1", name=2, action=None)
+
+    assert ThingSchema().dump(thing) == {
+        "id": 1,
+        "title": "2",
+        "action": None,
+    }
+
+
+def test_missing_attributes_are_left_to_marshmallow() -> None:
+    assert ThingSchema().dump(SimpleNamespace(id=1)) == {"id": 1}
+
+
+def test_mappings_are_left_to_marshmallow() -> None:
+    assert ThingSchema().dump([{"id": 1, "name": "a"}], many=True) == [
+        {"id": 1, "title": "a"}
+    ]
+
+
+def test_none_is_left_to_marshmallow() -> None:
+    schema = ThingSchema(many=True)
+
+    assert schema.dump(None) == Schema.dump(schema, None)
+
+
+class HookSchema(BaseSchema):
+    id = Integer()
+
+    @post_dump
+    def add_type(self, data: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        return {**data, "type": "hook"}
+
+
+class ByValueSchema(BaseSchema):
+    action = Enum(FirewallAction, by_value=True)
+
+
+class AsStringSchema(BaseSchema):
+    id = Integer(as_string=True)
+
+
+class BooleanSchema(BaseSchema):
+    flag = Boolean()
+
+
+class DottedSchema(BaseSchema):
+    id = Integer(attribute="parent.id")
+
+
+class NestedByNameSchema(BaseSchema):
+    thing = Nested("ThingSchema")
+
+
+class NestedOnlySchema(BaseSchema):
+    thing = Nested(ThingSchema, only=("id",))
+
+
+class NestedHookSchema(BaseSchema):
+    hook = Nested(HookSchema)
+
+
+class NestedCallableSchema(BaseSchema):
+    thing = Nested(lambda: ThingSchema())
+
+
+@pytest.mark.parametrize(
+    "schema",
+    [
+        HookSchema(),
+        ByValueSchema(),
+        AsStringSchema(),
+        BooleanSchema(),
+        DottedSchema(),
+        NestedByNameSchema(),
+        NestedOnlySchema(),
+        NestedHookSchema(),
+        NestedCallableSchema(),
+        ThingSchema(only=("id",)),
+        ThingSchema(load_only=("name",)),
+        ThingSchema(dump_only=("name",)),
+        PageSchema(ThingSchema)(),
+    ],
+)
+def test_unsupported_schemas_are_not_compiled(schema: Schema) -> None:
+    assert compile_dumper(schema) is None
+
+
+def test_unsupported_schemas_are_dumped_by_marshmallow() -> None:
+    assert HookSchema().dump(SimpleNamespace(id=1)) == {"id": 1, "type": "hook"}
+
+
+def test_fields_that_an_instance_loads_only_are_not_dumped() -> None:
+    thing = SimpleNamespace(id=1, name="a", action=None)
+
+    assert ThingSchema().dump(thing) == {"id": 1, "title": "a", "action": None}
+
+    assert ThingSchema(load_only=("name",)).dump(thing) == {
+        "id": 1,
+        "action": None,
+    }
+
+
+def test_nested_schemas_are_dumped_singly() -> None:
+    class ParentSchema(BaseSchema):
+        thing = Nested(ThingSchema)
+
+    parent = SimpleNamespace(
+        thing=SimpleNamespace(id=1, name="a", action=FirewallAction.ALLOW)
+    )
+
+    assert ParentSchema().dump(parent) == {
+        "thing": {"id": 1, "title": "a", "action": "ALLOW"}
+    }
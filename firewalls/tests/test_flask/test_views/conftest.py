@@ -1,6 +1,10 @@
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Any, Callable, ContextManager, Generator
 
 import pytest
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 
 from firewalls.models import (
     FilteringPolicy,
@@ -74,3 +78,30 @@ def rule(
 @pytest.fixture
 def another_rule(filtering_policy: FilteringPolicy) -> FirewallRule:
     return FirewallRuleFactory.create(filtering_policy=filtering_policy)
+
+
+RecordStatements = Callable[[], ContextManager[list[str]]]
+
+
+@pytest.fixture
+def record_statements(db_: SQLAlchemy) -> RecordStatements:
+    """
+    Record the SQL statements executed within a `with` block, e.g. to count
+    those that a single request makes.
+    """
+
+    @contextmanager
+    def record_statements() -> Generator[list[str]]:
+        statements: list[str] = []
+
+        def record(*args: Any) -> None:
+            statements.append(args[2])
+
+        event.listen(db_.engine, "before_cursor_execute", record)
+
+        try:
+            yield statements
+        finally:
+            event.remove(db_.engine, "before_cursor_execute", record)
+
+    return record_statements
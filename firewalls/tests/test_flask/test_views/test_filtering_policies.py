@@ -3,14 +3,19 @@ from typing import Any
 
 import pytest
 from flask.testing import FlaskClient
+from flask_sqlalchemy import SQLAlchemy
 
 from conftest import DefaultHeaderFlaskClient
 from firewalls.models import (
     FilteringPolicy,
     Firewall,
     FirewallRule,
+    Packet,
+)
+from firewalls.repositories import (
+    FilteringPolicyOrderBy,
+    NestedFirewallRuleRepository,
 )
-from firewalls.repositories import FilteringPolicyOrderBy
 from firewalls.tests.factories import FirewallRuleFactory
 
 
@@ -354,34 +359,40 @@ class TestFilteringPoliciesById:
             data = response.json
 
             assert data is not None
-            assert data["id"] == filtering_policy.id
-            assert data["name"] == filtering_policy.name
-            assert data["firewall"] == {
-                "id": firewall.id,
-                "name": firewall.name,
+
+            assert data == {
+                "id": filtering_policy.id,
+                "name": filtering_policy.name,
+                "default_action": filtering_policy.default_action.name,
+                "firewall": {
+                    "id": firewall.id,
+                    "name": firewall.name,
+                },
+                "rules": [
+                    {
+                        "id": rule.id,
+                        "action": rule.action.name,
+                        "priority": rule.priority,
+                        "sources": [
+                            {
+                                "address": source.address,
+                                "port": source.port,
+                            }
+                            for source in rule.sources
+                        ],
+                        "destinations": [
+                            {
+                                "address": destination.address,
+                                "port": destination.port,
+                            }
+                            for destination in rule.destinations
+                        ],
+                        "ports": [
+                            {"number": port.number} for port in rule.ports
+                        ],
+                    }
+                ],
             }
-            assert data["rules"] == [
-                {
-                    "id": rule.id,
-                    "action": rule.action.name,
-                    "priority": rule.priority,
-                    "sources": [
-                        {
-                            "address": source.address,
-                            "port": source.port,
-                        }
-                        for source in rule.sources
-                    ],
-                    "destinations": [
-                        {
-                            "address": destination.address,
-                            "port": destination.port,
-                        }
-                        for destination in rule.destinations
-                    ],
-                    "ports": [{"number": port.number} for port in rule.ports],
-                }
-            ]
 
         class TestWhenTheFilteringPolicyIsSoftDeleted:
             @pytest.fixture
@@ -611,3 +622,127 @@ class TestFilteringPolicyInspections:
                     "action": filtering_policy.default_action.name,
                     "active_rule": None,
                 }
+
+        class TestWhenSeveralRulesMayMatch:
+            @pytest.fixture
+            def rules(
+                self,
+                filtering_policy: FilteringPolicy,
+                source_address: str,
+                source_port: int,
+                destination_address: str,
+                destination_port: int,
+            ) -> list[FirewallRule]:
+                return [
+                    FirewallRuleFactory.create(
+                        filtering_policy=filtering_policy,
+                        priority=priority,
+                        sources__address=address,
+                        sources__port=port,
+                        destinations__address=destination_address,
+                        destinations__port=destination_port,
+                    )
+                    for priority, address, port in [
+                        (1, source_address, source_port + 1),
+                        (2, "123.123.0.2", source_port),
+                        (3, "123.123.1.0/24", source_port),
+                        (4, "123.123.0.0/24", source_port),
+                        (5, source_address, source_port),
+                    ]
+                ]
+
+            @pytest.fixture
+            def partially_matching_rules(
+                self,
+                db_: SQLAlchemy,
+                filtering_policy: FilteringPolicy,
+                source_address: str,
+                source_port: int,
+                destination_address: str,
+                destination_port: int,
+            ) -> list[FirewallRule]:
+                """
+                Rules ahead of all the others, each with one source or
+                destination that matches the packet and one that does not
+                """
+                rules = []
+
+                for address, relationship, mismatched_address in [
+                    (source_address, "sources", "123.123.0.2"),
+                    (source_address, "destinations", "96.96.0.2"),
+                    (source_address, "sources", "123.123.1.0/24"),
+                    ("123.123.0.0/24", "sources", "123.123.0.2"),
+                ]:
+                    rule = FirewallRuleFactory.create(
+                        filtering_policy=filtering_policy,
+                        priority=0,
+                        sources__address=address,
+                        sources__port=source_port,
+                        destinations__address=destination_address,
+                        destinations__port=destination_port,
+                    )
+
+                    getattr(rule, relationship)[1].address = mismatched_address
+
+                    rules.append(rule.set_hashes())
+
+                db_.session.commit()
+
+                return rules
+
+            def test_rules_with_any_mismatched_address_are_not_candidates(
+                self,
+                db_: SQLAlchemy,
+                firewall: Firewall,
+                filtering_policy: FilteringPolicy,
+                rules: list[FirewallRule],
+                partially_matching_rules: list[FirewallRule],
+                source_address: str,
+                source_port: int,
+                destination_address: str,
+                destination_port: int,
+            ) -> None:
+                packet = Packet(
+                    source_address=source_address,
+                    source_port=source_port,
+                    destination_address=destination_address,
+                    destination_port=destination_port,
+                )
+
+                candidates = db_.session.scalars(
+                    NestedFirewallRuleRepository(
+                        firewall.id, filtering_policy.id, db_
+                    ).select_candidates(packet)
+                ).all()
+
+                # Subnets are left to be matched in Python, so only the rule
+                # whose mismatched source is a subnet remains a candidate
+                assert [rule.id for rule in candidates] == [
+                    partially_matching_rules[2].id,
+                    rules[2].id,
+                    rules[3].id,
+                    rules[4].id,
+                ]
+
+            def test_the_first_matching_rule_by_priority_is_applied(
+                self,
+                firewall: Firewall,
+                filtering_policy: FilteringPolicy,
+                rules: list[FirewallRule],
+                partially_matching_rules: list[FirewallRule],
+                client: FlaskClient,
+                source_address: str,
+                source_port: int,
+                destination_address: str,
+                destination_port: int,
+            ) -> None:
+                response = client.get(
+                    f"/firewalls/{firewall.id}/filtering-policies/{filtering_policy.id}/inspections/?source_address={source_address}&source_port={source_port}&destination_address={destination_address}&destination_port={destination_port}"
+                )
+
+                assert response.status_code == 200
+                data = response.json
+
+                assert data is not None
+
+                assert data["active_rule"]["id"] == rules[3].id
@@ -1,8 +1,10 @@
+import json
 from datetime import datetime, timezone
 from typing import Any
 
 import pytest
 from flask.testing import FlaskClient
+from flask_sqlalchemy import SQLAlchemy
 
 from conftest import DefaultHeaderFlaskClient
 from firewalls.models import (
@@ -11,6 +13,9 @@ from firewalls.models import (
     FirewallRule,
 )
 from firewalls.repositories import FirewallOrderBy
+from firewalls.tests.factories import FirewallFactory
+from firewalls.tests.test_flask.test_views.conftest import RecordStatements
+from settings import Settings
 
 
 class TestFirewalls:
@@ -82,6 +87,109 @@ class TestFirewalls:
             assert response.json["total"] == 0
             assert response.json["items"] == []
 
+        def test_it_filters_by_ids(
+            self,
+            firewall: Firewall,
+            another_firewall: Firewall,
+            client: FlaskClient,
+        ) -> None:
+            response = client.get(f"/firewalls/?ids={another_firewall.id},9999")
+
+            assert response.status_code == 200
+
+            assert response.json is not None
+
+            assert response.json["total"] == 1
+            assert response.json["items"][0]["id"] == another_firewall.id
+
+        def test_it_filters_by_after_id(
+            self,
+            firewall: Firewall,
+            another_firewall: Firewall,
+            client: FlaskClient,
+        ) -> None:
+            response = client.get(
+                f"/firewalls/?after_id={firewall.id}&page_size=1"
+            )
+
+            assert response.status_code == 200
+
+            assert response.json is not None
+
+            assert response.json["total"] == 1
+            assert response.json["items"][0]["id"] == another_firewall.id
+
+        def test_a_422_is_returned_when_an_invalid_id_is_provided(
+            self, client: FlaskClient
+        ) -> None:
+            response = client.get("/firewalls/?ids=1,0")
+
+            assert response.status_code == 422
+
+        def test_a_422_is_returned_when_more_ids_than_a_page_are_provided(
+            self, settings: Settings, client: FlaskClient
+        ) -> None:
+            ids = ",".join(
+                str(id_) for id_ in range(1, settings.max_per_page + 2)
+            )
+
+            response = client.get(f"/firewalls/?ids={ids}")
+
+            assert response.status_code == 422
+
+        def test_nested_records_are_loaded_eagerly(
+            self,
+            db_: SQLAlchemy,
+            client: FlaskClient,
+            record_statements: RecordStatements,
+        ) -> None:
+            FirewallFactory.create_batch(3)
+
+            db_.session.commit()
+            db_.session.expunge_all()
+
+            with record_statements() as statements:
+                response = client.get("/firewalls/")
+
+            assert response.status_code == 200
+
+            # Firewalls, filtering policies, rules and then the rules' sources,
+            # destinations and ports, however many firewalls there are
+            assert len(statements) == 6
+
+        @pytest.mark.parametrize(
+            ("query", "count_expected"),
+            [
+                ("page_size=2&page=1", True),
+                ("page_size=2&page=2", False),
+                ("page_size=3&page=1", True),
+                ("page_size=4&page=1", False),
+            ],
+        )
+        def test_the_total_is_only_counted_for_full_pages(
+            self,
+            db_: SQLAlchemy,
+            client: FlaskClient,
+            query: str,
+            count_expected: bool,
+            record_statements: RecordStatements,
+        ) -> None:
+            FirewallFactory.create_batch(3)
+
+            db_.session.commit()
+
+            with record_statements() as statements:
+                response = client.get(f"/firewalls/?{query}")
+
+            assert response.status_code == 200
+            assert response.json is not None
+            assert response.json["total"] == 3
+
+            assert (
+                any("count(*)" in statement for statement in statements)
+                == count_expected
+            )
+
         def test_it_paginates_data(
             self,
             firewall: Firewall,
@@ -300,6 +408,17 @@ class TestFirewallsById:
                 }
             ]
 
+        def test_keys_are_returned_in_schema_order(
+            self, firewall: Firewall, client: FlaskClient
+        ) -> None:
+            response = client.get(f"/firewalls/{firewall.id}/")
+
+            assert list(json.loads(response.data)) == [
+                "id",
+                "name",
+                "filtering_policies",
+            ]
+
         class TestWhenTheFirewallIsSoftDeleted:
             @pytest.fixture
             def firewall_deleted_at(self) -> datetime:
@@ -331,6 +450,14 @@ class TestFirewallsById:
                 "message": "A firewall with id=9999 was not found",
             }
 
+        @pytest.mark.parametrize(("id_",), (("0",), (str(2**63),)))
+        def test_an_out_of_range_id_returns_404(
+            self, id_: str, client: FlaskClient
+        ) -> None:
+            response = client.get(f"/firewalls/{id_}/")
+
+            assert response.status_code == 404
+
     class TestDelete:
         def test_an_unauthenticated_request_is_unauthorized(
             self, unauthenticated_client: DefaultHeaderFlaskClient
@@ -1,9 +1,11 @@
 from datetime import datetime, timezone
 from typing import Any, Callable
+from unittest.mock import patch
 from uuid import uuid4
 
 import pytest
 from flask.testing import FlaskClient
+from flask_sqlalchemy import SQLAlchemy
 
 from conftest import DefaultHeaderFlaskClient
 from firewalls.models import (
@@ -13,6 +15,8 @@ from firewalls.models import (
     FirewallRule,
 )
 from firewalls.repositories import FirewallRuleOrderBy
+from firewalls.services import build_firewall_rule
+from firewalls.tests.test_flask.test_views.conftest import RecordStatements
 
 
 class TestFirewallRules:
@@ -156,6 +160,26 @@ class TestFirewallRules:
             assert response.json["total"] == 0
             assert response.json["items"] == []
 
+        def test_an_address_and_port_must_match_the_same_source(
+            self,
+            firewall: Firewall,
+            filtering_policy: FilteringPolicy,
+            rule: FirewallRule,
+            client: FlaskClient,
+        ) -> None:
+            source = rule.sources[0]
+
+            response = client.get(
+                f"/firewalls/{firewall.id}/filtering-policies/{filtering_policy.id}/rules/"
+                f"?source_address={source.address}&source_port={source.port + 1}"
+            )
+
+            assert response.status_code == 200
+
+            assert response.json is not None
+
+            assert response.json["total"] == 0
+
         def test_it_paginates_data(
             self,
             firewall: Firewall,
@@ -333,6 +357,109 @@ class TestFirewallRules:
 
             assert data["priority"] == 123
 
+        def test_the_children_that_were_built_are_the_ones_stored(
+            self,
+            firewall: Firewall,
+            filtering_policy: FilteringPolicy,
+            client: FlaskClient,
+            payload: dict[str, Any],
+        ) -> None:
+            def build_normalised_firewall_rule(
+                *args: Any, **kwargs: Any
+            ) -> FirewallRule:
+                rule = build_firewall_rule(*args, **kwargs)
+
+                for source in rule.sources:
+                    source.address = "100.100.100.0/25"
+
+                return rule
+
+            with patch(
+                "firewalls.use_cases.build_firewall_rule",
+                build_normalised_firewall_rule,
+            ):
+                response = client.post(
+                    f"/firewalls/{firewall.id}/filtering-policies/{filtering_policy.id}/rules/",
+                    json=payload,
+                )
+
+            assert response.status_code == 201, response.json
+            assert response.json is not None
+
+            assert response.json["sources"] == [
+                {"address": "100.100.100.0/25", "port": 8080}
+            ]
+
+        def test_the_policy_is_loaded_with_a_single_join_to_its_firewall(
+            self,
+            firewall: Firewall,
+            filtering_policy: FilteringPolicy,
+            db_: SQLAlchemy,
+            client: FlaskClient,
+            payload: dict[str, Any],
+            record_statements: RecordStatements,
+        ) -> None:
+            url = f"/firewalls/{firewall.id}/filtering-policies/{filtering_policy.id}/rules/"
+
+            db_.session.commit()
+
+            with record_statements() as statements:
+                response = client.post(url, json=payload)
+
+            assert response.status_code == 201, response.json
+
+            # The first statement to select is the one loading the policy
+            select_ = next(
+                statement
+                for statement in statements
+                if statement.startswith("SELECT")
+            )
+
+            assert "FROM filtering_policies" in select_
+            assert select_.count("JOIN firewalls") == 1
+
+        def test_related_records_are_inserted_in_bulk(
+            self,
+            firewall: Firewall,
+            filtering_policy: FilteringPolicy,
+            rule: FirewallRule,
+            db_: SQLAlchemy,
+            client: FlaskClient,
+            payload: dict[str, Any],
+            record_statements: RecordStatements,
+        ) -> None:
+            payload["sources"] = [
+                {"address": f"100.100.100.{i}", "port": 8080} for i in range(5)
+            ]
+            payload["ports"] = [{"number": number} for number in range(5)]
+
+            url = f"/firewalls/{firewall.id}/filtering-policies/{filtering_policy.id}/rules/"
+
+            db_.session.commit()
+
+            with record_statements() as statements:
+                response = client.post(url, json=payload)
+
+            commands = [statement.split()[0] for statement in statements]
+
+            assert response.status_code == 201, response.json
+
+            first_insert = commands.index("INSERT")
+
+            # Only the policy, and not its existing rules, is loaded
+            assert commands[:first_insert].count("SELECT") == 1
+
+            # One for the rule and then one each for its sources, destinations
+            # and ports
+            assert commands.count("INSERT") == 4
+
+            data = response.json
+
+            assert data is not None
+
+            assert data["sources"] == payload["sources"]
+            assert data["ports"] == payload["ports"]
+
         def test_it_ignores_unknown_fields(
             self,
             firewall: Firewall,
@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
 
 import pytest
+from flask_sqlalchemy import SQLAlchemy
 
 from firewalls.models import (
     FilteringPolicy,
@@ -9,6 +10,7 @@ from firewalls.models import (
     Inspection,
     Packet,
     ValidationError,
+    is_valid_ip_address_or_subnet_cidr,
 )
 from firewalls.tests.factories import (
     FilteringPolicyFactory,
@@ -277,6 +279,22 @@ class TestFilteringPolicy:
                 rule.action, rule
             )
 
+        @pytest.mark.parametrize(
+            "priorities", ((1, 2), (2, 1), (1, 1), (1, -1))
+        )
+        def test_rules_are_loaded_in_priority_order(
+            self,
+            db_: SQLAlchemy,
+            filtering_policy: FilteringPolicy,
+            rules: list[FirewallRule],
+        ) -> None:
+            db_.session.commit()
+            db_.session.expire(filtering_policy, ["rules"])
+
+            assert filtering_policy.rules == sorted(
+                rules, key=lambda rule: (rule.priority, rule.id)
+            )
+
     @pytest.mark.parametrize(
         ("name", "is_valid"),
         (("foo", True), ("   foo  ", True), ("", False), ("    ", False)),
@@ -318,6 +336,7 @@ class TestFirewallRuleSource:
             ("invalid", False),
             ("1.1.1.00/24", False),
             ("1.1.1.1/33", False),
+            ("::1", True),
             ("1.1.1.1/32", True),
             ("1.1.1.0/16", False),
             ("1.1.0.0/16", True),
@@ -333,6 +352,30 @@ class TestFirewallRuleSource:
             ):
                 FirewallRuleSourceFactory.build(address=address)
 
+    @pytest.mark.parametrize(
+        ("address", "ip", "matches"),
+        (
+            ("1.1.1.1", "1.1.1.1", True),
+            ("1.1.1.1", "1.1.1.2", False),
+            ("1.1.1.0/24", "1.1.1.2", True),
+            ("1.1.1.0/24", "1.1.2.1", False),
+            ("1.1.1.0/24", "invalid", False),
+        ),
+    )
+    def test_ip_matches(self, address: str, ip: str, matches: bool) -> None:
+        source = FirewallRuleSourceFactory.build(address=address)
+
+        assert source.ip_matches(ip) is matches
+
+    def test_address_validation_is_cached(self) -> None:
+        FirewallRuleSourceFactory.build(address="10.0.0.0/8")
+
+        hits = is_valid_ip_address_or_subnet_cidr.cache_info().hits
+
+        FirewallRuleSourceFactory.build(address="10.0.0.0/8")
+
+        assert is_valid_ip_address_or_subnet_cidr.cache_info().hits == hits + 1
+
     @pytest.mark.parametrize(
         ("port", "is_valid"),
         ((0, True), (80, True), (65535, True), (-1, False), (65536, False)),
@@ -0,0 +1,106 @@
+import pytest
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import raiseload
+
+from firewalls.models import FilteringPolicy
+from firewalls.repositories import (
+    FirewallRepository,
+    NestedFilteringPolicyRepository,
+    NestedFirewallRuleRepository,
+)
+from firewalls.tests.factories import FirewallFactory
+
+
+class TestLoading:
+    @pytest.fixture
+    def ids(self, db_: SQLAlchemy) -> tuple[int, int, int]:
+        firewall = FirewallFactory.create()
+        filtering_policy = firewall.filtering_policies[0]
+
+        ids = (firewall.id, filtering_policy.id, filtering_policy.rules[0].id)
+
+        db_.session.commit()
+        db_.session.expunge_all()
+
+        return ids
+
+    def test_firewall_relationships_need_no_further_queries(
+        self, db_: SQLAlchemy, ids: tuple[int, int, int]
+    ) -> None:
+        firewall_id, _, _ = ids
+
+        firewall = FirewallRepository(db_).get(firewall_id)
+
+        for filtering_policy in firewall.filtering_policies:
+            assert filtering_policy.firewall is firewall
+
+            for rule in filtering_policy.rules:
+                assert rule.sources and rule.destinations and rule.ports
+
+    def test_filtering_policy_relationships_need_no_further_queries(
+        self, db_: SQLAlchemy, ids: tuple[int, int, int]
+    ) -> None:
+        firewall_id, filtering_policy_id, _ = ids
+
+        filtering_policy = NestedFilteringPolicyRepository(
+            firewall_id, db_
+        ).get(filtering_policy_id)
+
+        assert filtering_policy.firewall.id == firewall_id
+
+        for rule in filtering_policy.rules:
+            assert rule.filtering_policy is filtering_policy
+            assert rule.sources and rule.destinations and rule.ports
+
+    def test_unloaded_relationships_cannot_be_lazy_loaded(
+        self, db_: SQLAlchemy, ids: tuple[int, int, int]
+    ) -> None:
+        firewall_id, filtering_policy_id, rule_id = ids
+
+        rule = NestedFirewallRuleRepository(
+            firewall_id, filtering_policy_id, db_
+        ).get(rule_id)
+
+        assert rule.sources and rule.destinations and rule.ports
+
+        with pytest.raises(InvalidRequestError):
+            rule.filtering_policy.rules
+
+
+class TestScoping:
+    def test_statements_are_scoped_to_each_repository(
+        self, db_: SQLAlchemy
+    ) -> None:
+        policy_ids = {
+            firewall.id: {policy.id for policy in firewall.filtering_policies}
+            for firewall in FirewallFactory.create_batch(2)
+        }
+
+        for firewall_id, ids in policy_ids.items():
+            policies = db_.session.scalars(
+                NestedFilteringPolicyRepository(firewall_id, db_).select()
+            ).all()
+
+            assert {policy.id for policy in policies} == ids
+
+    def test_options_given_to_a_repository_are_applied(
+        self, db_: SQLAlchemy
+    ) -> None:
+        firewall_id = FirewallFactory.create().id
+
+        db_.session.commit()
+        db_.session.expunge_all()
+
+        NestedFilteringPolicyRepository(firewall_id, db_).select()
+
+        select_ = NestedFilteringPolicyRepository(
+            firewall_id, db_, options=[raiseload(FilteringPolicy.firewall)]
+        ).select()
+
+        filtering_policy = db_.session.scalars(select_).first()
+
+        assert filtering_policy is not None
+
+        with pytest.raises(InvalidRequestError):
+            filtering_policy.firewall
@@ -1,6 +1,10 @@
 from dataclasses import dataclass
 from typing import Any
 
+from sqlalchemy import insert, inspect
+from sqlalchemy.orm.attributes import set_committed_value
+
+from db import Base
 from firewalls.models import (
     FilteringPolicy,
     Firewall,
@@ -87,6 +91,13 @@ class CreateFirewallRuleCommand:
     filtering_policy_id: int
 
 
+_RULE_CHILDREN: dict[str, type[Base]] = {
+    "sources": FirewallRuleSource,
+    "destinations": FirewallRuleDestination,
+    "ports": FirewallRulePort,
+}
+
+
 class CreateFirewallRule(UseCase[CreateFirewallRuleCommand, FirewallRule]):
     def __init__(
         self,
@@ -123,8 +134,51 @@ class CreateFirewallRule(UseCase[CreateFirewallRuleCommand, FirewallRule]):
 
         self.db.session.add(firewall_rule)
 
+        self._insert_children(firewall_rule)
+
         return firewall_rule
 
+    def _insert_children(self, firewall_rule: FirewallRule) -> None:
+        """
+        The ORM would insert the children of a rule one statement at a time, in
+        order to fetch their generated columns.  Instead, detach them, insert
+        their column values with a single statement per table and have them
+        loaded afresh when they are next accessed.
+        """
+        children: dict[type[Base], list[Any]] = {}
+
+        for relationship, model_type in _RULE_CHILDREN.items():
+            children[model_type] = list(getattr(firewall_rule, relationship))
+
+            for child in children[model_type]:
+                self.db.session.expunge(child)
+
+            set_committed_value(firewall_rule, relationship, [])
+
+        self.db.session.flush()
+
+        for model_type, instances in children.items():
+            columns = {
+                column.key for column in inspect(model_type).column_attrs
+            }
+
+            self.db.session.execute(
+                insert(model_type),
+                [
+                    {
+                        **{
+                            key: value
+                            for key, value in inspect(child).dict.items()
+                            if key in columns
+                        },
+                        "firewall_rule_id": firewall_rule.id,
+                    }
+                    for child in instances
+                ],
+            )
+
+        self.db.session.expire(firewall_rule, list(_RULE_CHILDREN))
+
 
 @dataclass(frozen=True)
 class DeleteFirewallCommand:
@@ -3,13 +3,17 @@ from enum import StrEnum
 from typing import Any, Generic, TypeVar
 
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Select
+from sqlalchemy import ColumnElement, Select
 from sqlalchemy.orm.interfaces import ORMOption
 
 from db import Base
 
 T = TypeVar("T", bound=Base)
 
+# Statements are relatively costly to build but immutable, so the part of each
+# that does not depend on a repository's state is built once per class
+_unscoped_selects: dict[tuple[type["Repository"], bool], Select] = {}
+
 
 class Repository(Generic[T], ABC):
     """
@@ -39,17 +43,61 @@ class Repository(Generic[T], ABC):
     def model_type(self) -> type[T]:
         raise NotImplementedError()  # pragma: nocover
 
+    def select_unscoped(self) -> Select:
+        """
+        Select all records, without the criteria given by `scope`.  This must
+        not depend on the repository's state, other than its options.
+        """
+        return self.db.select(self.model_type).options(*self.options)
+
+    def scope(self) -> list[ColumnElement[bool]]:
+        """
+        Criteria that depend on the repository's state, e.g. the IDs of parent
+        records.
+        """
+        return []
+
+    def _select(self, *, include_deleted: bool) -> Select:
+        key = (type(self), include_deleted)
+        cacheable = self.options is self.default_options
+
+        select_ = _unscoped_selects.get(key) if cacheable else None
+
+        if select_ is None:
+            select_ = self.select_unscoped()
+
+            if not include_deleted:
+                select_ = select_.where(self.model_type.deleted_at.is_(None))
+
+            if cacheable:
+                _unscoped_selects[key] = select_
+
+        criteria = self.scope()
+
+        return select_.where(*criteria) if criteria else select_
+
     def select_all(self) -> Select:
-        return self.db.select(self.model_type).options(*self.default_options)
+        return self._select(include_deleted=True)
 
     def select(self) -> Select:
-        return self.select_all().where(self.model_type.deleted_at.is_(None))
+        return self._select(include_deleted=False)
 
     def filter(
-        self, *, order_by: StrEnum | None = None, **filters: Any
+        self,
+        *,
+        ids: list[int] | None = None,
+        after_id: int | None = None,
+        order_by: StrEnum | None = None,
+        **filters: Any,
     ) -> Select:
         select_ = self.select()
 
+        if ids is not None:
+            select_ = select_.where(self.model_type.id.in_(ids))
+
+        if after_id is not None:
+            select_ = select_.where(self.model_type.id > after_id)
+
         for attr, value in filters.items():
             select_ = select_.where(getattr(self.model_type, attr) == value)
 
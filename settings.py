@@ -37,6 +37,8 @@ class Settings(BaseSettings, frozen=True):  # type: ignore[misc]
     max_per_page: int = 100
 
     jwt_secret: str
+    jwt_cache_enabled: bool = False
+    jwt_verification_workers: int = 0
 
     model_config = SettingsConfigDict(
         env_file=root_directory() / ".env",
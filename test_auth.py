@@ -1,12 +1,34 @@
+import base64
+import hashlib
+import hmac
+import time
 from datetime import timedelta
-from typing import cast
+from typing import Generator, cast
+from unittest.mock import MagicMock, patch
 
 import jwt
 import pytest
 from flask import Flask
 from flask.testing import FlaskCliRunner
 
-from auth import JWT_ALGORITHM, User, UserRole, decode_jwt, encode_jwt
+import auth
+from auth import (
+    JWT_ALGORITHM,
+    AuthenticationError,
+    TTLCache,
+    User,
+    UserRole,
+    _decode_jwt,
+    _fast_decode_hs256,
+    _fast_encode_hs256,
+    _invalid_jwt_cache,
+    _jwt_cache,
+    authorise,
+    configure_auth,
+    decode_jwt,
+    encode_jwt,
+    verify_token,
+)
 from conftest import DefaultHeaderFlaskClient
 from settings import Settings
 
@@ -29,6 +51,23 @@ def test_a_200_is_returned_for_a_valid_jwt(
     assert response.status_code == 200
 
 
+def test_the_token_is_only_verified_once_per_request(
+    client: DefaultHeaderFlaskClient,
+) -> None:
+    with patch("auth.decode_jwt", wraps=decode_jwt) as decode:
+        assert client.get("/health/").status_code == 200
+
+    decode.assert_called_once()
+
+
+def test_a_401_is_returned_when_no_user_has_logged_in() -> None:
+    app = Flask(__name__)
+
+    app.add_url_rule("/", "view", authorise(UserRole.VIEWER)(lambda: "OK"))
+
+    assert app.test_client().get("/").status_code == 401
+
+
 class TestWhenJWTIsInvalid:
     @pytest.fixture
     def headers(self) -> dict[str, str]:
@@ -42,6 +81,121 @@ class TestWhenJWTIsInvalid:
 
         assert response.status_code == 401
 
+    def test_the_token_is_verified_on_every_request(
+        self,
+        client: DefaultHeaderFlaskClient,
+    ) -> None:
+        with patch("auth.decode_jwt", wraps=decode_jwt) as decode:
+            assert client.get("/health/").status_code == 401
+            assert client.get("/health/").status_code == 401
+
+        assert decode.call_count == 2
+
+    class TestWhenTheCacheIsEnabled:
+        @pytest.fixture(autouse=True)
+        def cache_settings(self, settings: Settings) -> Generator[Settings]:
+            _invalid_jwt_cache.clear()
+
+            cache_settings = settings.model_copy(
+                update={"jwt_cache_enabled": True}
+            )
+
+            configure_auth(cache_settings)
+
+            yield cache_settings
+
+            configure_auth(settings)
+
+            _invalid_jwt_cache.clear()
+
+        def test_the_token_is_only_verified_once(
+            self,
+            client: DefaultHeaderFlaskClient,
+        ) -> None:
+            with patch("auth.decode_jwt", wraps=decode_jwt) as decode:
+                assert client.get("/health/").status_code == 401
+                assert client.get("/health/").status_code == 401
+
+            decode.assert_called_once()
+
+
+class TestWhenAuthIsNotConfigured:
+    def test_verifying_a_token_raises_a_runtime_error(
+        self, user_jwt: str
+    ) -> None:
+        with patch("auth._settings", None):
+            with pytest.raises(
+                RuntimeError, match="Authentication has not been configured"
+            ):
+                verify_token(user_jwt)
+
+
+class TestWhenVerificationIsOffloaded:
+    @pytest.fixture(autouse=True)
+    def offload_settings(self, settings: Settings) -> Generator[Settings]:
+        offload_settings = settings.model_copy(
+            update={"jwt_verification_workers": 2}
+        )
+
+        configure_auth(offload_settings)
+
+        yield offload_settings
+
+        configure_auth(settings)
+
+    def test_tokens_are_verified_on_the_thread_pool(
+        self, user: User, user_jwt: str
+    ) -> None:
+        assert auth._executor is not None
+
+        assert verify_token(user_jwt) == user
+
+    def test_a_401_is_returned_when_verification_times_out(
+        self, client: DefaultHeaderFlaskClient
+    ) -> None:
+        with patch("auth.JWT_VERIFICATION_TIMEOUT", 0), patch(
+            "auth.decode_jwt", side_effect=lambda *_: time.sleep(0.1)
+        ):
+            response = client.get("/health/")
+
+        assert response.status_code == 401
+
+    def test_verification_stays_inline_under_gevent(
+        self, offload_settings: Settings
+    ) -> None:
+        with patch("auth._threads_are_patched", return_value=True):
+            configure_auth(offload_settings)
+
+        assert auth._executor is None
+
+
+class TestWhenTheSchemeIsLowerCase:
+    @pytest.fixture
+    def headers(self, user_jwt: str) -> dict[str, str]:
+        return {"Authorization": f"bearer {user_jwt}"}
+
+    def test_a_200_is_returned(
+        self,
+        client: DefaultHeaderFlaskClient,
+    ) -> None:
+        response = client.get("/health/")
+
+        assert response.status_code == 200
+
+
+class TestWhenTheSchemeIsNotBearer:
+    @pytest.fixture
+    def headers(self, user_jwt: str) -> dict[str, str]:
+        return {"Authorization": f"Basic {user_jwt}"}
+
+    def test_a_401_is_returned(
+        self,
+        client: DefaultHeaderFlaskClient,
+    ) -> None:
+        response = client.get("/health/")
+
+        assert response.status_code == 401
+
 
 class TestWhenJWTIsMissing:
     @pytest.fixture
@@ -90,10 +244,12 @@ class TestWhenJwtContainsNoUsername:
 
 
 class TestWhenJwtContainsInvalidRoles:
-    @pytest.fixture
-    def user_jwt(self, settings: Settings) -> str:
+    @pytest.fixture(params=(["not_a_role"], [["admin"]], None))
+    def user_jwt(
+        self, settings: Settings, request: pytest.FixtureRequest
+    ) -> str:
         return jwt.encode(
-            {"username": "foo", "roles": ["not_a_role"]},
+            {"username": "foo", "roles": request.param},
             settings.jwt_secret,
             JWT_ALGORITHM,
         )
@@ -118,3 +274,251 @@ class TestPrintJwtCmd:
         decoded_user = decode_jwt(settings, result.output[:-1])  # strip newline
 
         assert decoded_user == User("test", tuple(UserRole))
+
+
+class TestDecodeJwt:
+    def test_it_returns_the_user(
+        self, settings: Settings, user: User, user_jwt: str
+    ) -> None:
+        assert decode_jwt(settings, user_jwt) == user
+
+    def test_it_decodes_tokens_that_pyjwt_encodes(
+        self, settings: Settings, user: User
+    ) -> None:
+        token = jwt.encode(
+            {
+                "username": user.username,
+                "roles": [role.value for role in user.roles],
+                "exp": time.time() + 60,
+            },
+            settings.jwt_secret,
+            algorithm=JWT_ALGORITHM,
+        )
+
+        assert decode_jwt(settings, token) == user
+
+    def test_it_encodes_tokens_that_pyjwt_decodes(
+        self, settings: Settings, user: User
+    ) -> None:
+        payload = jwt.decode(
+            encode_jwt(settings, user),
+            settings.jwt_secret,
+            algorithms=[JWT_ALGORITHM],
+        )
+
+        assert payload["username"] == user.username
+        assert payload["roles"] == [role.value for role in user.roles]
+
+    def test_it_rejects_an_invalid_token(self, settings: Settings) -> None:
+        with pytest.raises(AuthenticationError):
+            decode_jwt(settings, "not_a_jwt")
+
+
+def test_fast_encode_hs256_matches_pyjwt(settings: Settings) -> None:
+    payload = {"username": "foo", "roles": ["admin"], "exp": time.time()}
+
+    assert _fast_encode_hs256(payload, settings.jwt_secret) == jwt.encode(
+        payload, settings.jwt_secret, algorithm=JWT_ALGORITHM
+    )
+
+
+class TestFastDecodeHs256:
+    def test_it_matches_pyjwt(self, settings: Settings, user_jwt: str) -> None:
+        assert _fast_decode_hs256(user_jwt, settings.jwt_secret) == jwt.decode(
+            user_jwt, settings.jwt_secret, algorithms=[JWT_ALGORITHM]
+        )
+
+    def test_it_accepts_headers_that_we_do_not_issue(
+        self, settings: Settings
+    ) -> None:
+        token = jwt.encode(
+            {"username": "foo"},
+            settings.jwt_secret,
+            JWT_ALGORITHM,
+            headers={"kid": "1"},
+        )
+
+        assert _fast_decode_hs256(token, settings.jwt_secret) == {
+            "username": "foo"
+        }
+
+    def test_it_rejects_a_token_signed_with_another_secret(
+        self, settings: Settings
+    ) -> None:
+        token = jwt.encode({"username": "foo"}, "another", JWT_ALGORITHM)
+
+        with pytest.raises(AuthenticationError):
+            _fast_decode_hs256(token, settings.jwt_secret)
+
+    def test_it_rejects_a_token_with_another_algorithm(
+        self, settings: Settings
+    ) -> None:
+        token = jwt.encode(
+            {"username": "foo"}, settings.jwt_secret, algorithm="HS512"
+        )
+
+        with pytest.raises(AuthenticationError):
+            _fast_decode_hs256(token, settings.jwt_secret)
+
+    @pytest.mark.parametrize(
+        ("claims",),
+        (
+            ({"exp": time.time() - 10},),
+            ({"nbf": time.time() + 60},),
+            ({"iat": time.time() + 60},),
+            ({"exp": "not_a_timestamp"},),
+        ),
+    )
+    def test_it_rejects_invalid_time_claims(
+        self, settings: Settings, claims: dict[str, object]
+    ) -> None:
+        token = jwt.encode(claims, settings.jwt_secret, JWT_ALGORITHM)
+
+        with pytest.raises(AuthenticationError):
+            _fast_decode_hs256(token, settings.jwt_secret)
+
+    @pytest.mark.parametrize(
+        ("payload",),
+        (
+            (b"not_json",),
+            (b"[]",),
+        ),
+    )
+    def test_it_rejects_signed_payloads_that_are_not_objects(
+        self, settings: Settings, payload: bytes
+    ) -> None:
+        header = base64.urlsafe_b64encode(b'{"alg":"HS256"}').rstrip(b"=")
+        signing_input = header + b"." + base64.urlsafe_b64encode(payload)
+        signature = hmac.new(
+            settings.jwt_secret.encode(), signing_input, hashlib.sha256
+        ).digest()
+
+        token = b".".join(
+            (signing_input, base64.urlsafe_b64encode(signature))
+        ).decode()
+
+        with pytest.raises(AuthenticationError):
+            _fast_decode_hs256(token, settings.jwt_secret)
+
+    @pytest.mark.parametrize(
+        ("token",),
+        (
+            ("not_a_jwt",),
+            ("a.b.c",),
+            ("a.b.c.d",),
+        ),
+    )
+    def test_it_rejects_malformed_tokens(
+        self, settings: Settings, token: str
+    ) -> None:
+        with pytest.raises(AuthenticationError):
+            _fast_decode_hs256(token, settings.jwt_secret)
+
+
+class TestTTLCache:
+    @pytest.fixture
+    def now(self) -> Generator[MagicMock]:
+        with patch("auth.time.monotonic", return_value=100.0) as mock:
+            yield mock
+
+    @pytest.fixture
+    def cache(self, now: MagicMock) -> TTLCache[str, int]:
+        return TTLCache(maxsize=2, ttl=5)
+
+    def test_it_returns_cached_values(self, cache: TTLCache[str, int]) -> None:
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+
+    def test_entries_expire(
+        self, cache: TTLCache[str, int], now: MagicMock
+    ) -> None:
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=1)
+
+        now.return_value = 102.0
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+
+        now.return_value = 106.0
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_the_least_recently_used_entry_is_evicted(
+        self, cache: TTLCache[str, int]
+    ) -> None:
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        cache.get("a")
+
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+
+class TestDecodeJwtWhenCacheIsEnabled:
+    @pytest.fixture
+    def cache_settings(self, settings: Settings) -> Generator[Settings]:
+        _jwt_cache.clear()
+
+        yield settings.model_copy(update={"jwt_cache_enabled": True})
+
+        _jwt_cache.clear()
+
+    def test_the_token_is_only_verified_once(
+        self, cache_settings: Settings, user: User, user_jwt: str
+    ) -> None:
+        with patch("auth._decode_jwt", wraps=_decode_jwt) as decode:
+            assert decode_jwt(cache_settings, user_jwt) == user
+            assert decode_jwt(cache_settings, user_jwt) == user
+
+        decode.assert_called_once()
+
+    def test_the_cache_is_keyed_on_the_secret(
+        self, cache_settings: Settings, user_jwt: str
+    ) -> None:
+        decode_jwt(cache_settings, user_jwt)
+
+        rotated_settings = cache_settings.model_copy(
+            update={"jwt_secret": "rotated"}
+        )
+
+        with pytest.raises(AuthenticationError):
+            decode_jwt(rotated_settings, user_jwt)
+
+    def test_string_expiries_are_converted(
+        self, cache_settings: Settings, user: User
+    ) -> None:
+        token = jwt.encode(
+            {"username": user.username, "roles": [], "exp": "9999999999"},
+            cache_settings.jwt_secret,
+            JWT_ALGORITHM,
+        )
+
+        assert decode_jwt(cache_settings, token) == User(user.username, ())
+
+    @pytest.fixture
+    def configured_cache_settings(
+        self, settings: Settings, cache_settings: Settings
+    ) -> Generator[Settings]:
+        configure_auth(cache_settings)
+
+        yield cache_settings
+
+        configure_auth(settings)
+
+    def test_the_cache_key_is_only_computed_once_per_request(
+        self, configured_cache_settings: Settings, user: User, user_jwt: str
+    ) -> None:
+        with patch(
+            "auth._jwt_cache_key", wraps=auth._jwt_cache_key
+        ) as cache_key:
+            assert verify_token(user_jwt) == user
+
+        cache_key.assert_called_once()